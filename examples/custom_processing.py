@@ -34,7 +34,7 @@ def custom_data_processing():
         # 處理作者列表
         authors = item.get('authors', [])
         if authors:
-            print(f"作者: {', '.join(set(authors[:5]))}")
+            print(f"作者: {', '.join(dict.fromkeys(authors[:5]))}")
 
     # 儲存處理後的資料
     crawler.save()
@@ -2,9 +2,24 @@
 主程式入口
 """
 
+import logging
+import os
 import sys
 from pathlib import Path
-from src.core.crawler import WebCrawler
+
+
+def setup_logging():
+    """設定日誌輸出，層級可由環境變數 LOG_LEVEL 指定 (預設 WARNING)"""
+    level = getattr(logging, os.environ.get('LOG_LEVEL', 'WARNING').upper(), None)
+    if not isinstance(level, int):
+        level = logging.WARNING
+
+    # 日誌只輸出層級與訊息，不計算時間戳記，也不收集執行緒與行程資訊
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    logging.basicConfig(level=level, format='%(levelname)s: %(message)s')
 
 
 def main():
@@ -20,6 +35,11 @@ def main():
         print(f"錯誤: 配置文件不存在 - {config_path}")
         sys.exit(1)
 
+    setup_logging()
+
+    # 延遲載入爬蟲模組 (yaml、requests、lxml 等)，使用說明與參數錯誤時不需載入
+    from src.core.crawler import WebCrawler
+
     try:
         # 創建並執行爬蟲
         crawler = WebCrawler(config_path)
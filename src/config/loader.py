@@ -2,10 +2,38 @@
 配置加載器 - 支援 YAML 和 JSON 格式
 """
 
+import copy
 import json
+import warnings
 import yaml
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # libyaml 的 C 實作，解析速度遠快於純 Python 版本
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# 有安裝 orjson 時以它解析 JSON，否則使用標準函式庫
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 已解析配置的 LRU 快取: 絕對路徑 -> (mtime, size, 配置字典)
+_CONFIG_CACHE: 'OrderedDict[str, Tuple[float, int, Dict[str, Any]]]' = OrderedDict()
+_CONFIG_CACHE_MAXSIZE = 100
+
+# 讀取配置文件的緩衝區大小
+_READ_BUFFER_SIZE = 64 * 1024
+
+_YAML_SUFFIXES = frozenset(('.yaml', '.yml'))
+_VALID_RULE_TYPES = frozenset(('css', 'xpath'))
+_VALID_OUTPUT_FORMATS = frozenset(('json', 'csv'))
 
 
 class ConfigLoader:
@@ -27,13 +55,100 @@ class ConfigLoader:
         if not path.exists():
             raise FileNotFoundError(f"配置文件不存在: {config_path}")
 
-        with open(path, 'r', encoding='utf-8') as f:
-            if path.suffix in ['.yaml', '.yml']:
-                return yaml.safe_load(f)
-            elif path.suffix == '.json':
-                return json.load(f)
-            else:
-                raise ValueError(f"不支援的配置文件格式: {path.suffix}")
+        # 以 mtime + size 判斷快取是否仍有效
+        key = str(path.resolve())
+        stat = path.stat()
+        cached = _CONFIG_CACHE.get(key)
+
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            _CONFIG_CACHE.move_to_end(key)
+            config = cached[2]
+        else:
+            config = ConfigLoader._parse(path)
+            _CONFIG_CACHE[key] = (stat.st_mtime, stat.st_size, config)
+            _CONFIG_CACHE.move_to_end(key)
+
+            if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAXSIZE:
+                _CONFIG_CACHE.popitem(last=False)
+
+        # 回傳副本，避免呼叫端修改到快取內容
+        return copy.deepcopy(config)
+
+    @staticmethod
+    def _parse(path: Path) -> Dict[str, Any]:
+        """
+        解析配置文件
+
+        Args:
+            path: 配置文件路徑
+
+        Returns:
+            配置字典
+        """
+        if path.suffix in _YAML_SUFFIXES:
+            return ConfigLoader._load_yaml(path)
+        elif path.suffix == '.json':
+            with open(path, 'rb', buffering=_READ_BUFFER_SIZE) as f:
+                return _json_loads(f.read())
+        else:
+            raise ValueError(f"不支援的配置文件格式: {path.suffix}")
+
+    @staticmethod
+    def _load_yaml(path: Path) -> Dict[str, Any]:
+        """
+        解析 YAML 配置，並在旁邊寫入 JSON 快取檔
+
+        快取檔記錄了 YAML 的 mtime (奈秒) 與大小，兩者完全相同時才直接讀取快取，
+        JSON 解析比 YAML 快得多；快取過期、損毀或無法寫入時一律退回解析 YAML。
+
+        Args:
+            path: YAML 配置文件路徑
+
+        Returns:
+            配置字典
+        """
+        cache_path = path.with_suffix(path.suffix + '.cache.json')
+        stat = path.stat()
+
+        try:
+            with open(cache_path, 'rb', buffering=_READ_BUFFER_SIZE) as f:
+                cached = _json_loads(f.read())
+            if (isinstance(cached, dict)
+                    and cached.get('mtime_ns') == stat.st_mtime_ns
+                    and cached.get('size') == stat.st_size
+                    and 'config' in cached):
+                return cached['config']
+        except (OSError, ValueError):
+            pass
+
+        # 直接交給 libyaml 處理原始位元組，省去 Python 端的解碼
+        with open(path, 'rb', buffering=_READ_BUFFER_SIZE) as f:
+            if not yaml.__with_libyaml__:
+                # 預設警告過濾器下只會顯示一次
+                warnings.warn(
+                    "未偵測到 libyaml，改用純 Python 的 YAML 解析器",
+                    RuntimeWarning
+                )
+            config = yaml.load(f, Loader=SafeLoader)
+
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            text = json.dumps(config, ensure_ascii=False)
+
+            # 含日期、非字串鍵等無法以 JSON 原樣表示的內容時不寫入快取
+            if json.loads(text) == config:
+                entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'config': config}
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                tmp_path.replace(cache_path)
+        except (OSError, TypeError, ValueError):
+            # 寫入失敗時清掉暫存檔，避免留在配置目錄中
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+        return config
 
     @staticmethod
     def validate(config: Dict[str, Any]) -> bool:
@@ -46,10 +161,35 @@ class ConfigLoader:
         Returns:
             是否有效
         """
+        if not isinstance(config, dict):
+            raise ValueError("配置文件內容必須為鍵值對")
+
         required_fields = ['name', 'start_url', 'extract_rules']
 
         for field in required_fields:
             if field not in config:
                 raise ValueError(f"配置文件缺少必要欄位: {field}")
 
+        rules = config['extract_rules']
+        if not isinstance(rules, list):
+            raise ValueError("extract_rules 必須為列表")
+
+        # 單次走訪所有規則，檢查結構與類型
+        for index, rule in enumerate(rules):
+            if not isinstance(rule, dict):
+                raise ValueError(f"第 {index + 1} 條提取規則必須為鍵值對")
+
+            for key in ['field', 'selector']:
+                if not rule.get(key):
+                    raise ValueError(f"第 {index + 1} 條提取規則缺少必要欄位: {key}")
+
+            rule_type = rule.get('type', 'css')
+            if rule_type not in _VALID_RULE_TYPES:
+                raise ValueError(f"提取規則 {rule['field']} 的類型不支援: {rule_type}")
+
+        output = config.get('output') or {}
+        output_format = str(output.get('format', 'json')).lower()
+        if output_format not in _VALID_OUTPUT_FORMATS:
+            raise ValueError(f"不支援的輸出格式: {output_format}")
+
         return True
@@ -2,11 +2,22 @@
 核心爬蟲引擎
 """
 
-from typing import Dict, Any, List, Optional
+import logging
+from contextlib import closing
+from typing import Dict, Any, List, Optional, Set
+from urllib.parse import urljoin
 from ..config.loader import ConfigLoader
 from ..utils.http_client import HttpClient
 from ..extractors.extractor import DataExtractor
-from ..storage.storage import StorageFactory
+from ..storage.storage import StorageFactory, StreamWriter
+
+logger = logging.getLogger(__name__)
+
+# 不指向實際頁面的連結，視為沒有下一頁
+_DEAD_HREFS = frozenset(('', '#', 'javascript:void(0)', 'javascript:;'))
+
+# 帶有這些 class 的下一頁連結視為已停用
+_DISABLED_CLASSES = frozenset(('disabled', 'inactive', 'unavailable'))
 
 
 class WebCrawler:
@@ -26,15 +37,36 @@ class WebCrawler:
         # 初始化 HTTP 客戶端
         headers = self.config.get('headers', {})
         delay = self.config.get('delay', 1.0)
-        self.http_client = HttpClient(headers=headers, delay=delay)
+        self.http_client = HttpClient(
+            headers=headers,
+            delay=delay,
+            max_retries=self.config.get('max_retries', 3),
+            backoff_factor=self.config.get('backoff_factor', 0.5),
+            timeout=self.config.get('timeout', 30.0)
+        )
 
         # 儲存設定
-        self.storage_type = self.config.get('output', {}).get('format', 'json')
-        self.output_path = self.config.get('output', {}).get('path', 'output/data.json')
+        output = self.config.get('output') or {}
+        self.storage_type = output.get('format', 'json')
+        self.output_path = output.get('path', 'output/data.json')
+
+        # 爬取時反覆使用的設定，先取出避免每頁重複查找
+        self._name = self.config['name']
+        self._start_url = self.config['start_url']
+        self._pagination = self.config.get('pagination')
+
+        # 預先編譯所有規則，每頁直接使用，無效的選擇器也能提早發現
+        self._rules = DataExtractor.precompile(self.config['extract_rules'])
 
         # 爬取結果
         self.results = []
 
+        # run() 期間的輸出串流，設定後資料直接寫入檔案而不保留在記憶體
+        self._writer: Optional[StreamWriter] = None
+
+        # 本次爬取已爬過的 URL，避免分頁連結繞回已爬過的頁面
+        self.visited_urls: Set[str] = set()
+
     def crawl(self) -> List[Dict[str, Any]]:
         """
         執行爬蟲
@@ -42,24 +74,29 @@ class WebCrawler:
         Returns:
             爬取結果列表
         """
-        print(f"開始爬取: {self.config['name']}")
-        print(f"目標 URL: {self.config['start_url']}\n")
+        print(f"開始爬取: {self._name}")
+        print(f"目標 URL: {self._start_url}\n")
+
+        # 每次爬取重新記錄，同一實例再次爬取時不會被上一次的紀錄擋下
+        self.visited_urls = set()
 
         try:
             # 發送請求
-            response = self.http_client.get(self.config['start_url'])
+            response = self.http_client.get(self._start_url)
+            self.visited_urls.add(self._start_url)
             print(f"成功獲取網頁內容 (狀態碼: {response.status_code})")
 
             # 提取資料
             extractor = DataExtractor(response.text)
-            data = extractor.extract_all(self.config['extract_rules'])
+            data = extractor.extract_all(self._rules)
 
-            self.results.append(data)
-            print(f"提取資料: {data}\n")
+            self._collect(data)
+            # 完整資料僅在 DEBUG 層級輸出，格式化延後到通過層級過濾之後
+            logger.debug("提取資料: %s", data)
 
             # 如果有分頁或多頁爬取邏輯
-            if 'pagination' in self.config:
-                self._handle_pagination(extractor)
+            if self._pagination is not None:
+                self._handle_pagination(extractor, response.url)
 
             return self.results
 
@@ -70,51 +107,152 @@ class WebCrawler:
         finally:
             self.http_client.close()
 
-    def _handle_pagination(self, initial_extractor: DataExtractor):
+    def _handle_pagination(self, initial_extractor: DataExtractor, page_url: str):
         """
         處理分頁爬取
 
         Args:
             initial_extractor: 初始頁面的提取器
+            page_url: 初始頁面的 URL，用於解析相對連結
         """
-        pagination_config = self.config['pagination']
+        pagination_config = self._pagination
         max_pages = pagination_config.get('max_pages', 1)
+
+        # 可預先推算的分頁 URL 改為並行抓取
+        url_template = pagination_config.get('url_template')
+        if url_template:
+            self._handle_template_pagination(url_template, max_pages)
+            return
+
         next_page_selector = pagination_config.get('next_page_selector')
         next_page_type = pagination_config.get('type', 'css')
 
+        # 在迴圈外決定下一頁節點的查詢方式，只取第一個符合的節點
+        if next_page_type == 'css':
+            compiled = DataExtractor.compile(next_page_selector)
+        else:
+            compiled = DataExtractor.compile_xpath(next_page_selector)
+
+        def find_next(extractor: DataExtractor) -> Any:
+            results = extractor.select(compiled)
+            return results[0] if isinstance(results, list) and results else None
+
+        # 迴圈內反覆使用的屬性先綁定為區域變數
+        collect = self._collect
+        get = self.http_client.get
+        visited = self.visited_urls
+        rules = self._rules
+
         current_page = 1
 
         while current_page < max_pages:
             # 提取下一頁 URL
-            if next_page_type == 'css':
-                next_urls = initial_extractor.extract_by_css(
-                    next_page_selector,
-                    attr='href'
-                )
-            else:
-                next_urls = initial_extractor.extract_by_xpath(next_page_selector)
-
-            if not next_urls:
+            next_url = self._resolve_next_url(find_next(initial_extractor), page_url)
+
+            if next_url is None:
                 print("沒有更多頁面")
                 break
 
-            next_url = next_urls[0]
+            if next_url in visited:
+                print(f"下一頁已爬取過，停止分頁: {next_url}")
+                break
+
             print(f"爬取第 {current_page + 1} 頁: {next_url}")
 
             try:
-                response = self.http_client.get(next_url)
+                response = get(next_url)
+                visited.add(next_url)
                 extractor = DataExtractor(response.text)
-                data = extractor.extract_all(self.config['extract_rules'])
-                self.results.append(data)
-                print(f"提取資料: {data}\n")
+                data = extractor.extract_all(rules)
+                collect(data)
+                logger.debug("提取資料: %s", data)
 
                 initial_extractor = extractor
+                page_url = response.url
                 current_page += 1
 
             except Exception as e:
                 print(f"爬取分頁時發生錯誤: {str(e)}")
                 break
 
+    @staticmethod
+    def _resolve_next_url(node: Any, page_url: str) -> Optional[str]:
+        """
+        檢查下一頁節點是否有效並轉為絕對 URL
+
+        Args:
+            node: 下一頁選擇器選到的節點 (元素或屬性字串)，None 表示沒有找到
+            page_url: 目前頁面的 URL
+
+        Returns:
+            下一頁 URL，沒有有效的下一頁時返回 None
+        """
+        if node is None:
+            return None
+
+        if isinstance(node, str):
+            href = node
+        else:
+            classes = (node.get('class') or '').split()
+            if not _DISABLED_CLASSES.isdisjoint(classes):
+                return None
+
+            href = node.get('href') or ''
+
+        href = href.strip()
+        if href in _DEAD_HREFS:
+            return None
+
+        return urljoin(page_url, href)
+
+    def _handle_template_pagination(self, url_template: str, max_pages: int):
+        """
+        依 URL 模板並行抓取分頁
+
+        請求仍依 delay 間隔依序發出，但不必等上一頁回應完成；
+        資料提取在主執行緒依頁碼順序進行。
+
+        Args:
+            url_template: 分頁 URL 模板，以 {n} 代表頁碼
+            max_pages: 最大爬取頁數
+        """
+        urls = [url_template.format(n=n) for n in range(2, max_pages + 1)]
+        if not urls:
+            return
+
+        concurrency = self._pagination.get('concurrency', 4)
+        collect = self._collect
+        rules = self._rules
+
+        # 離開迴圈時關閉產生器，取消尚未開始的請求
+        with closing(self.http_client.get_many(urls, concurrency)) as responses:
+            for page, url in enumerate(urls, 2):
+                print(f"爬取第 {page} 頁: {url}")
+
+                try:
+                    response = next(responses)
+                    self.visited_urls.add(url)
+                    extractor = DataExtractor(response.text)
+                    data = extractor.extract_all(rules)
+                    collect(data)
+                    logger.debug("提取資料: %s", data)
+
+                except Exception as e:
+                    print(f"爬取分頁時發生錯誤: {str(e)}")
+                    break
+
+    def _collect(self, data: Dict[str, Any]):
+        """
+        收集一頁的提取結果
+
+        Args:
+            data: 提取結果
+        """
+        if self._writer is not None:
+            self._writer.write(data)
+        else:
+            self.results.append(data)
+
     def save(self):
         """儲存爬取結果"""
         if not self.results:
@@ -125,7 +263,18 @@ class WebCrawler:
         storage.save(self.results, self.output_path)
 
     def run(self):
-        """執行完整的爬取流程"""
-        self.crawl()
-        self.save()
-        print(f"\n爬取完成！共獲取 {len(self.results)} 筆資料")
+        """執行完整的爬取流程，每頁資料提取後直接寫入輸出檔案"""
+        storage = StorageFactory.create(self.storage_type)
+        writer = self._writer = storage.open_stream(self.output_path)
+        succeeded = False
+
+        try:
+            self.crawl()
+            succeeded = True
+        finally:
+            self._writer = None
+            # 爬取失敗且尚未寫入資料時不必關閉，避免在錯誤訊息前提示沒有資料
+            if succeeded or writer.count:
+                writer.close()
+
+        print(f"\n爬取完成！共獲取 {writer.count} 筆資料")
@@ -2,9 +2,130 @@
 資料提取器 - 支援 CSS Selector 和 XPath
 """
 
-from bs4 import BeautifulSoup
+import threading
+from cssselect import SelectorError
+from functools import cached_property, lru_cache
 from lxml import etree
-from typing import List, Dict, Any, Optional
+from lxml.cssselect import CSSSelector
+from typing import Callable, List, Dict, Any, Iterator, NamedTuple, Optional, Tuple, Union
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+# libxml2 解析器不是執行緒安全的，每個執行緒各自重用一個
+_parser_local = threading.local()
+
+
+def _html_parser(utf8: bool) -> etree.HTMLParser:
+    """
+    取得目前執行緒共用的 HTML 解析器
+
+    Args:
+        utf8: 輸入是否為自行編碼的 UTF-8；否則交由 libxml2 依 <meta charset> 判斷編碼
+
+    Returns:
+        HTML 解析器
+    """
+    name = 'utf8_parser' if utf8 else 'parser'
+    parser = getattr(_parser_local, name, None)
+    if parser is None:
+        parser = etree.HTMLParser(recover=True, remove_comments=True, remove_pis=True,
+                                  encoding='utf-8' if utf8 else None)
+        setattr(_parser_local, name, parser)
+    return parser
+
+
+# 取得元素完整文本 (等同 lxml.html 的 text_content())
+_element_text = etree.XPath('string()')
+
+
+def _stripped_text(element: etree._Element) -> str:
+    """取得元素去除前後空白的文本"""
+    return _element_text(element).strip()
+
+
+def _stripped_value(value: Any) -> str:
+    """將任意 XPath 結果轉為去除前後空白的字串"""
+    if isinstance(value, etree._Element):
+        return _stripped_text(value)
+    return str(value).strip()
+
+
+@lru_cache(maxsize=512)
+def _compiled_css(selector: str) -> etree.XPath:
+    """
+    將 CSS Selector 轉為 XPath 並編譯，相同選擇器只會處理一次
+
+    由 cssselect 轉換，不支援選擇器列表形式的 :not(.a, .b)、*:nth-of-type()
+    及 soupsieve 專有的 :-soup-contains() 等語法，這類選擇器請改用 XPath。
+    """
+    try:
+        return CSSSelector(selector, translator='html')
+    except SelectorError as e:
+        raise ValueError(f"無法編譯 CSS 選擇器 {selector!r}: {e}，請改用 XPath (type: xpath)") from e
+
+
+@lru_cache(maxsize=512)
+def _compiled_xpath(xpath: str) -> etree.XPath:
+    """編譯 XPath 表達式，相同表達式只會處理一次"""
+    return etree.XPath(xpath)
+
+
+@lru_cache(maxsize=512)
+def _xpath_handler_slot(xpath: str) -> List[Optional[Callable[[Any], str]]]:
+    """
+    各 XPath 表達式的結果轉換函式存放位置，依第一次的結果型別決定後重複使用
+
+    與編譯快取一樣有上限，長時間執行時動態產生的表達式不會無限累積。
+    """
+    return [None]
+
+
+class CompiledRule(NamedTuple):
+    """預先編譯的提取規則"""
+
+    field: str
+    kind: str  # css 或 xpath
+    selector: str
+    query: etree.XPath
+    attr: Optional[str]
+    multiple: bool
+
+
+def compile_rule(rule: Dict[str, Any]) -> CompiledRule:
+    """
+    編譯單條提取規則
+
+    CSS 規則會先轉為 XPath；轉換後常是從根節點開始的全域搜尋，
+    頁面較大時直接使用從根節點寫起的絕對 XPath (type: xpath) 會更快。
+
+    Args:
+        rule: 提取規則
+
+    Returns:
+        編譯後的規則
+    """
+    rule_type = rule.get('type', 'css')
+    selector = rule['selector']
+
+    if rule_type == 'css':
+        query = _compiled_css(selector)
+    elif rule_type == 'xpath':
+        query = _compiled_xpath(selector)
+    else:
+        raise ValueError(f"不支援的提取類型: {rule_type}")
+
+    return CompiledRule(
+        field=rule['field'],
+        kind=rule_type,
+        selector=selector,
+        query=query,
+        attr=rule.get('attr'),
+        multiple=rule.get('multiple', False)
+    )
 
 
 class DataExtractor:
@@ -18,8 +139,77 @@ class DataExtractor:
             html: HTML 內容
         """
         self.html = html
-        self.soup = BeautifulSoup(html, 'lxml')
-        self.tree = etree.HTML(html)
+        # 重用解析器並略過註解與處理指令；空白文件時 tree 為 None
+        if isinstance(html, str):
+            self.tree = etree.fromstring(html.encode('utf-8'), parser=_html_parser(True))
+        else:
+            self.tree = etree.fromstring(html, parser=_html_parser(False))
+
+    @cached_property
+    def soup(self) -> 'BeautifulSoup':
+        """
+        BeautifulSoup 物件，僅供自定義處理使用
+
+        提取資料只使用 lxml 樹，第一次存取時才解析，需要另外安裝 beautifulsoup4。
+        """
+        if BeautifulSoup is None:
+            raise ImportError("使用 DataExtractor.soup 需要安裝 beautifulsoup4")
+
+        return BeautifulSoup(self.html, 'lxml')
+
+    @staticmethod
+    def compile(selector: str) -> etree.XPath:
+        """
+        編譯 CSS Selector，相同選擇器只會編譯一次
+
+        Args:
+            selector: CSS 選擇器
+
+        Returns:
+            編譯後的選擇器，可直接作用於 DataExtractor.tree
+        """
+        return _compiled_css(selector)
+
+    @staticmethod
+    def compile_xpath(xpath: str) -> etree.XPath:
+        """
+        編譯 XPath 表達式，相同表達式只會編譯一次
+
+        Args:
+            xpath: XPath 表達式
+
+        Returns:
+            編譯後的 XPath
+        """
+        return _compiled_xpath(xpath)
+
+    @staticmethod
+    def precompile(rules: List[Union[Dict[str, Any], CompiledRule]]) -> List[CompiledRule]:
+        """
+        預先編譯提取規則，供同一組規則套用到多個文件時使用
+
+        Args:
+            rules: 提取規則列表
+
+        Returns:
+            編譯後的規則列表，可直接傳給 extract_all()
+        """
+        return [rule if isinstance(rule, CompiledRule) else compile_rule(rule) for rule in rules]
+
+    def select(self, compiled: etree.XPath) -> List[Any]:
+        """
+        在文件上執行編譯後的選擇器
+
+        Args:
+            compiled: compile() 或 compile_xpath() 回傳的物件
+
+        Returns:
+            符合的節點列表，HTML 無法解析時為空列表
+        """
+        if self.tree is None:
+            return []
+
+        return compiled(self.tree)
 
     def extract_by_css(self, selector: str, attr: Optional[str] = None) -> List[str]:
         """
@@ -32,17 +222,38 @@ class DataExtractor:
         Returns:
             提取結果列表
         """
-        elements = self.soup.select(selector)
-        results = []
+        return self.extract_by_compiled(self.compile(selector), attr)
 
-        for element in elements:
-            if attr:
-                value = element.get(attr, '')
-            else:
-                value = element.get_text(strip=True)
-            results.append(value)
+    def extract_by_compiled(self, compiled: etree.XPath,
+                            attr: Optional[str] = None) -> List[str]:
+        """
+        使用編譯後的 CSS Selector 提取資料
+
+        Args:
+            compiled: DataExtractor.compile() 回傳的選擇器
+            attr: 要提取的屬性名稱，None 表示提取文本
+
+        Returns:
+            提取結果列表
+        """
+        return self._element_values(self.select(compiled), attr)
+
+    @staticmethod
+    def _element_values(elements: List[Any], attr: Optional[str]) -> List[str]:
+        """
+        取出元素的屬性值或文本
 
-        return results
+        Args:
+            elements: lxml 元素列表
+            attr: 要提取的屬性名稱，None 表示提取文本
+
+        Returns:
+            提取結果列表
+        """
+        if attr:
+            return [element.get(attr, '') for element in elements]
+
+        return [_stripped_text(element) for element in elements]
 
     def extract_by_xpath(self, xpath: str) -> List[str]:
         """
@@ -54,17 +265,44 @@ class DataExtractor:
         Returns:
             提取結果列表
         """
-        results = self.tree.xpath(xpath)
+        return self._xpath_values(xpath, self.compile_xpath(xpath))
+
+    def _xpath_values(self, xpath: str, compiled: etree.XPath) -> List[str]:
+        """
+        執行編譯後的 XPath 並將結果轉為字串列表
+
+        Args:
+            xpath: XPath 表達式
+            compiled: 編譯後的 XPath
+
+        Returns:
+            提取結果列表
+        """
+        results = self.select(compiled)
+        if not results:
+            return []
+
+        # 同一表達式的結果型別固定 (text()、@attr 為字串，其餘為元素)，
+        # 依第一個結果選定轉換函式，避免逐筆判斷型別
+        slot = _xpath_handler_slot(xpath)
+        handler = slot[0]
+        if handler is None:
+            handler = str.strip if isinstance(results[0], str) else _stripped_text
+            slot[0] = handler
 
-        # 轉換為字符串列表
-        return [str(r).strip() if not isinstance(r, str) else r.strip() for r in results]
+        try:
+            return [handler(r) for r in results]
+        except TypeError:
+            # 混合型別的結果 (例如聯集) 改為逐筆判斷
+            slot[0] = _stripped_value
+            return [_stripped_value(r) for r in results]
 
-    def extract_all(self, rules: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def extract_all(self, rules: List[Union[Dict[str, Any], CompiledRule]]) -> Dict[str, Any]:
         """
         根據規則提取所有資料
 
         Args:
-            rules: 提取規則列表
+            rules: 提取規則列表，也可以是 precompile() 編譯後的規則
                   [{
                       "field": "title",
                       "type": "css",  # or "xpath"
@@ -76,31 +314,56 @@ class DataExtractor:
         Returns:
             提取結果字典
         """
-        data = {}
+        return dict(self.iter_extract_all(rules))
+
+    def iter_extract_all(
+        self, rules: List[Union[Dict[str, Any], CompiledRule]]
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        根據規則逐一提取欄位，依規則順序產生 (欄位, 值)
+
+        Args:
+            rules: 提取規則列表，格式同 extract_all()
+
+        Yields:
+            (欄位名稱, 提取結果)
+        """
+        # 同一份文件上相同的選擇器只查詢一次，由多個欄位共用結果
+        css_elements: Dict[str, List[Any]] = {}
+        xpath_results: Dict[str, List[str]] = {}
 
         for rule in rules:
-            field = rule['field']
-            rule_type = rule.get('type', 'css')
-            selector = rule['selector']
-            attr = rule.get('attr')
-            multiple = rule.get('multiple', False)
+            if isinstance(rule, CompiledRule):
+                field, multiple = rule.field, rule.multiple
+            else:
+                field, multiple = rule['field'], rule.get('multiple', False)
 
             try:
-                if rule_type == 'css':
-                    results = self.extract_by_css(selector, attr)
-                elif rule_type == 'xpath':
-                    results = self.extract_by_xpath(selector)
+                compiled = rule if isinstance(rule, CompiledRule) else compile_rule(rule)
+                selector = compiled.selector
+
+                if compiled.kind == 'css':
+                    elements = css_elements.get(selector)
+                    if elements is None:
+                        elements = self.select(compiled.query)
+                        css_elements[selector] = elements
+                    results = self._element_values(elements, compiled.attr)
                 else:
-                    raise ValueError(f"不支援的提取類型: {rule_type}")
+                    results = xpath_results.get(selector)
+                    if results is None:
+                        results = self._xpath_values(selector, compiled.query)
+                        xpath_results[selector] = results
+                    else:
+                        results = list(results)
 
                 # 根據 multiple 設定決定返回單個還是多個結果
                 if multiple:
-                    data[field] = results
+                    value = results
                 else:
-                    data[field] = results[0] if results else None
+                    value = results[0] if results else None
 
             except Exception as e:
                 print(f"提取欄位 {field} 時發生錯誤: {str(e)}")
-                data[field] = None if not multiple else []
+                value = None if not multiple else []
 
-        return data
+            yield field, value
@@ -5,9 +5,73 @@
 import json
 import csv
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 from abc import ABC, abstractmethod
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 寫入輸出檔案的緩衝區大小，減少系統呼叫次數
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _json_dumps(data: Any) -> bytes:
+    """
+    序列化為縮排 2 格的 UTF-8 JSON，有安裝 orjson 時優先使用
+
+    Args:
+        data: 要序列化的資料
+
+    Returns:
+        JSON 位元組
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson 不支援的型別 (例如超過 64 位元的整數) 交給標準函式庫處理
+            pass
+
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+class StreamWriter:
+    """逐筆寫入的輸出串流，預設實作會暫存資料並在關閉時一次儲存"""
+
+    def __init__(self, storage: 'BaseStorage', output_path: str):
+        """
+        初始化輸出串流
+
+        Args:
+            storage: 儲存實例
+            output_path: 輸出路徑
+        """
+        self.storage = storage
+        self.output_path = output_path
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]):
+        """
+        寫入一筆資料
+
+        Args:
+            record: 資料
+        """
+        self._buffer.append(record)
+        self.count += 1
+
+    def close(self):
+        """關閉串流並儲存資料"""
+        if not self._buffer:
+            print("沒有資料需要儲存")
+            return
+
+        self.storage.save(self._buffer, self.output_path)
+        self._buffer = []
+
 
 class BaseStorage(ABC):
     """儲存基類"""
@@ -17,6 +81,18 @@ class BaseStorage(ABC):
         """儲存資料"""
         pass
 
+    def open_stream(self, output_path: str) -> StreamWriter:
+        """
+        開啟逐筆寫入的輸出串流
+
+        Args:
+            output_path: 輸出路徑
+
+        Returns:
+            輸出串流
+        """
+        return StreamWriter(self, output_path)
+
 
 class JsonStorage(BaseStorage):
     """JSON 格式儲存"""
@@ -29,12 +105,69 @@ class JsonStorage(BaseStorage):
             data: 資料列表
             output_path: 輸出路徑
         """
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        self.save_streaming(data, output_path)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def save_streaming(self, data: Iterable[Dict[str, Any]], output_path: str):
+        """
+        逐筆序列化並寫入 JSON 陣列，不需一次在記憶體中保留完整的輸出內容
 
-        print(f"資料已儲存至: {output_path}")
+        Args:
+            data: 資料列表或產生資料的迭代器
+            output_path: 輸出路徑
+        """
+        writer = JsonStreamWriter(self, output_path)
+
+        try:
+            for record in data:
+                writer.write(record)
+        finally:
+            if writer.count:
+                writer.close()
+
+        if not writer.count:
+            # 沒有資料時仍輸出空陣列
+            path = Path(output_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'[]')
+
+            print(f"資料已儲存至: {output_path}")
+
+    def open_stream(self, output_path: str) -> StreamWriter:
+        """開啟 JSON 輸出串流，每筆資料直接寫入檔案"""
+        return JsonStreamWriter(self, output_path)
+
+
+class JsonStreamWriter(StreamWriter):
+    """JSON 輸出串流，輸出內容與 JsonStorage.save 相同"""
+
+    def __init__(self, storage: BaseStorage, output_path: str):
+        super().__init__(storage, output_path)
+        self._file = None
+
+    def write(self, record: Dict[str, Any]):
+        """寫入一筆資料，第一筆寫入時才建立檔案"""
+        if self._file is None:
+            Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_path, 'wb', buffering=_WRITE_BUFFER_SIZE)
+            self._file.write(b'[\n')
+        else:
+            self._file.write(b',\n')
+
+        # 每筆資料在陣列中再縮排一層
+        self._file.write(b'  ' + _json_dumps(record).replace(b'\n', b'\n  '))
+        self.count += 1
+
+    def close(self):
+        """寫入結尾並關閉檔案"""
+        if self._file is None:
+            print("沒有資料需要儲存")
+            return
+
+        self._file.write(b'\n]')
+        self._file.close()
+        self._file = None
+
+        print(f"資料已儲存至: {self.output_path}")
 
 
 class CsvStorage(BaseStorage):
@@ -57,13 +190,91 @@ class CsvStorage(BaseStorage):
         # 取得所有欄位名稱
         fieldnames = list(data[0].keys())
 
-        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        # 直接依欄位順序取值寫入，避免 DictWriter 每列的字典轉換
+        rows = [[record.get(key, '') for key in fieldnames] for record in data]
+
+        text = self._plain_csv_text(fieldnames, rows)
+
+        with open(output_path, 'w', newline='', encoding='utf-8-sig',
+                  buffering=_WRITE_BUFFER_SIZE) as f:
+            if text is not None:
+                f.write(text)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(fieldnames)
+                writer.writerows(rows)
 
         print(f"資料已儲存至: {output_path}")
 
+    @staticmethod
+    def _plain_csv_text(fieldnames: List[str], rows: List[List[Any]]) -> Optional[str]:
+        """
+        資料都是不需要引號的字串時，直接組出與 csv.writer 相同的內容
+
+        Args:
+            fieldnames: 欄位名稱
+            rows: 依欄位順序排列的資料列
+
+        Returns:
+            CSV 內容；有非字串或需要引號的值時回傳 None，改用 csv.writer
+        """
+        # 單一欄位的空字串會被 csv.writer 加上引號，直接交給 csv.writer
+        if len(fieldnames) < 2:
+            return None
+
+        try:
+            lines = [','.join(fieldnames)]
+            lines.extend(map(','.join, rows))
+        except TypeError:
+            return None
+
+        text = '\r\n'.join(lines)
+        # 分隔符號數量不符代表有值含逗號
+        if ('"' in text or '\n' in text or '\r' in text
+                or text.count(',') != len(lines) * (len(fieldnames) - 1)):
+            return None
+
+        return text + '\r\n'
+
+    def open_stream(self, output_path: str) -> StreamWriter:
+        """開啟 CSV 輸出串流，每筆資料直接寫入檔案"""
+        return CsvStreamWriter(self, output_path)
+
+
+class CsvStreamWriter(StreamWriter):
+    """CSV 輸出串流，欄位名稱取自第一筆資料"""
+
+    def __init__(self, storage: BaseStorage, output_path: str):
+        super().__init__(storage, output_path)
+        self._file = None
+        self._writer = None
+        self._fieldnames: List[str] = []
+
+    def write(self, record: Dict[str, Any]):
+        """寫入一筆資料，第一筆寫入時才建立檔案與標題列"""
+        if self._file is None:
+            Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_path, 'w', newline='', encoding='utf-8-sig',
+                              buffering=_WRITE_BUFFER_SIZE)
+            self._fieldnames = list(record.keys())
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self._fieldnames)
+
+        self._writer.writerow([record.get(key, '') for key in self._fieldnames])
+        self.count += 1
+
+    def close(self):
+        """關閉檔案"""
+        if self._file is None:
+            print("沒有資料需要儲存")
+            return
+
+        self._file.close()
+        self._file = None
+        self._writer = None
+
+        print(f"資料已儲存至: {self.output_path}")
+
 
 class StorageFactory:
     """儲存工廠類"""
@@ -3,25 +3,55 @@ HTTP 客戶端 - 處理網頁請求
 """
 
 import requests
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Iterator, List
+from urllib.parse import urlsplit
+import threading
 import time
 
 
 class HttpClient:
     """HTTP 請求客戶端"""
 
-    def __init__(self, headers: Optional[Dict[str, str]] = None, delay: float = 1.0):
+    def __init__(self, headers: Optional[Dict[str, str]] = None, delay: float = 1.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, timeout: float = 30.0):
         """
         初始化 HTTP 客戶端
 
         Args:
             headers: 自定義請求標頭
             delay: 請求間隔延遲（秒）
+            max_retries: 連線失敗或伺服器錯誤 (5xx) 時的重試次數
+            backoff_factor: 重試等待時間的基數（秒），每次重試加倍
+            timeout: 連線與讀取的逾時秒數，伺服器無回應時才會觸發重試
         """
         self.session = requests.Session()
         self.delay = delay
-
-        # 預設 User-Agent
+        self.timeout = timeout
+
+        # 由 urllib3 處理重試與退避，並遵守伺服器回傳的 Retry-After
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False
+        )
+
+        # 擴大連線池，讓同一主機的連線保持 keep-alive 重複使用，也足夠並行分頁使用
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=32,
+            pool_maxsize=64,
+            pool_block=False
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # 預設 User-Agent；Accept-Encoding 沿用 requests 的預設值，
+        # 它只會列出已安裝解壓套件的編碼 (例如 brotli、zstandard)
         default_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
                          '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -31,7 +61,10 @@ class HttpClient:
             default_headers.update(headers)
 
         self.session.headers.update(default_headers)
-        self.last_request_time = 0
+
+        # 各主機最近一次請求的時間 (time.monotonic)，延遲依主機分開計算
+        self._host_last: Dict[str, float] = {}
+        self._delay_lock = threading.Lock()
 
     def get(self, url: str, **kwargs) -> requests.Response:
         """
@@ -39,24 +72,78 @@ class HttpClient:
 
         Args:
             url: 目標 URL
-            **kwargs: 其他請求參數
+            **kwargs: 其他請求參數，可傳入 timeout 覆寫預設逾時
 
         Returns:
             Response 對象
         """
+        host = urlsplit(url).netloc
+        kwargs.setdefault('timeout', self.timeout)
+
         # 實施請求延遲
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        self._apply_delay(host)
+
+        try:
+            response = self.session.get(url, **kwargs)
+        finally:
+            # 下一次請求的延遲從本次請求結束後起算
+            with self._delay_lock:
+                self._host_last[host] = max(self._host_last[host], time.monotonic())
+
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            # 釋放連線回連線池
+            response.close()
+            raise
 
-        if time_since_last_request < self.delay:
-            time.sleep(self.delay - time_since_last_request)
+        return response
 
-        response = self.session.get(url, **kwargs)
-        response.raise_for_status()
+    def _apply_delay(self, host: str):
+        """
+        對同一主機的請求間隔至少 delay 秒，不同主機互不影響
 
-        self.last_request_time = time.time()
+        在鎖內預約發送時間點後才睡眠，並行請求同一主機時會依序錯開，
+        等待期間也不會阻擋其他主機的請求。
 
-        return response
+        Args:
+            host: 目標主機 (netloc)
+        """
+        with self._delay_lock:
+            now = time.monotonic()
+            last = self._host_last.get(host)
+            wait = 0.0 if last is None else max(0.0, last + self.delay - now)
+            self._host_last[host] = now + wait
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def get_many(self, urls: List[str], concurrency: int = 4,
+                 **kwargs) -> Iterator[requests.Response]:
+        """
+        並行發送多個 GET 請求，依 urls 的順序逐一返回回應
+
+        請求仍依 delay 間隔發出，但不必等待前一個回應完成。
+        任一請求失敗時拋出該例外；停止迭代或關閉產生器時會取消尚未開始的請求。
+
+        Args:
+            urls: 目標 URL 列表
+            concurrency: 同時進行的請求數
+            **kwargs: 其他請求參數
+
+        Returns:
+            Response 對象的迭代器
+        """
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+        try:
+            futures = [executor.submit(self.get, url, **kwargs) for url in urls]
+
+            for future in futures:
+                yield future.result()
+
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def close(self):
         """關閉會話"""